@@ -16,7 +16,13 @@
 """This module contains TensorRT utils."""
 
 import ctypes
+import functools
+import hashlib
+import json
+import mmap
+import os
 import platform
+import threading
 
 import onnx
 import onnx_graphsurgeon as gs
@@ -31,18 +37,226 @@ try:
 except ImportError:
     TRT_PYTHON_AVAILABLE = False
 
+_HASH_CHUNK_SIZE = 8 * (1024**2)  # 8MB
+_STD_DOMAINS = {"", "ai.onnx", "ai.onnx.ml"}
+_TRT_BUILDER_LOCK = threading.Lock()
+_LOADED_PLUGINS: set[str] = set()
+
+
+def _safe_nptype(trt_dtype: "trt.DataType"):
+    """Returns the numpy type of a TensorRT datatype, or None if it has no numpy equivalent."""
+    try:
+        return trt.nptype(trt_dtype)
+    except TypeError:
+        return None
+
+
+def _get_trt_to_np_dtypes() -> dict:
+    """Returns a mapping from TensorRT datatypes to numpy types, for those that have a numpy equivalent."""
+    return {
+        trt_dtype: np_dtype
+        for trt_dtype in trt.DataType.__members__.values()
+        if (np_dtype := _safe_nptype(trt_dtype)) is not None
+    }
+
+
+_TRT_TO_NP_DTYPES = _get_trt_to_np_dtypes() if TRT_PYTHON_AVAILABLE else {}
+_PLUGIN_LAYER_TYPES = (
+    {
+        getattr(trt.LayerType, name)
+        for name in ["PLUGIN", "PLUGIN_V2", "PLUGIN_V3"]
+        if hasattr(trt.LayerType, name)
+    }
+    if TRT_PYTHON_AVAILABLE
+    else set()
+)
+
+
+def _get_trt_parse_cache_dir() -> str:
+    """Returns the directory where the TensorRT parsing results are cached."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "modelopt", "trt_parse")
+
+
+def _update_hash_from_file(hasher: hashlib.blake2b, file_path: str) -> None:
+    """Updates the hasher with the contents of the given file, read in chunks via mmap."""
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for offset in range(0, len(mm), _HASH_CHUNK_SIZE):
+                hasher.update(mm[offset : offset + _HASH_CHUNK_SIZE])
+
+
+def _get_external_data_locations(onnx_model: onnx.ModelProto) -> set[str]:
+    """Returns the relative paths of the external data files referenced by the model's tensors."""
+    return {
+        onnx.external_data_helper.ExternalDataInfo(tensor).location
+        for tensor in onnx.external_data_helper._get_all_tensors(onnx_model)
+        if onnx.external_data_helper.uses_external_data(tensor)
+    }
+
+
+def _has_non_standard_nodes(onnx_model: onnx.ModelProto) -> bool:
+    """Checks whether the model has nodes that are not standard ONNX ops, i.e. potential TensorRT plugins.
+
+    Note that TensorRT plugins may be used in the default domain, so the op type is also checked against the
+    standard ONNX op schemas.
+    """
+    standard_ops = {schema.name for schema in onnx.defs.get_all_schemas()}
+    return any(
+        node.domain not in _STD_DOMAINS or node.op_type not in standard_ops
+        for node in onnx_model.graph.node
+    )
+
+
+def _get_trt_parse_cache_key(
+    onnx_path: str,
+    external_data_locations: set[str],
+    trt_plugins: list[str] | None,
+    strongly_typed: bool,
+) -> str:
+    """Computes the cache key of the TensorRT parsing results for the given ONNX file.
+
+    The key covers the ONNX file and its external data files, the TensorRT plugins (path, size and
+    modification time), the TensorRT version and the network creation mode.
+    """
+    hasher = hashlib.blake2b(digest_size=32)
+    hasher.update(f"{trt.__version__}|strongly_typed={strongly_typed}".encode())
+    _update_hash_from_file(hasher, onnx_path)
+
+    # Include external data files, if any, since TensorRT reads them during parsing
+    base_dir = os.path.dirname(os.path.abspath(onnx_path))
+    for location in sorted(external_data_locations):
+        hasher.update(location.encode())
+        _update_hash_from_file(hasher, os.path.join(base_dir, location))
+
+    for plugin in trt_plugins or []:
+        # Plugins given as library names are resolved by the dynamic loader, so only their name is hashed
+        if os.path.isfile(plugin):
+            stat = os.stat(plugin)
+            hasher.update(f"{os.path.abspath(plugin)}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+        else:
+            hasher.update(plugin.encode())
+
+    return hasher.hexdigest()
+
+
+def _load_trt_parse_cache(cache_path: str) -> tuple[list[str], dict] | None:
+    """Loads cached TensorRT parsing results. Returns None if the cache is missing or invalid."""
+    if not os.path.isfile(cache_path):
+        return None
+
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+        all_tensor_info = {
+            name: {"shape": info["shape"], "dtype": trt.DataType.__members__[info["dtype"]]}
+            for name, info in cached["all_tensor_info"].items()
+        }
+        return cached["custom_layers"], all_tensor_info
+    except Exception as e:
+        logger.warning(f"Failed to load TensorRT parsing cache {cache_path}: {e}")
+        return None
+
+
+def _save_trt_parse_cache(cache_path: str, custom_layers: list[str], all_tensor_info: dict) -> None:
+    """Saves TensorRT parsing results to the cache. Failures are logged and otherwise ignored."""
+    cached = {
+        "custom_layers": custom_layers,
+        "all_tensor_info": {
+            name: {"shape": info["shape"], "dtype": info["dtype"].name}
+            for name, info in all_tensor_info.items()
+        },
+    }
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # Write to a temporary file first so that concurrent readers never see a partial file
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(cached, f)
+        os.replace(tmp_path, cache_path)
+        logger.debug(f"Saved TensorRT parsing cache to {cache_path}")
+    except OSError as e:
+        logger.warning(f"Failed to save TensorRT parsing cache {cache_path}: {e}")
+
+
+@functools.lru_cache(maxsize=1)
+def _get_trt_builder() -> tuple["trt.Logger", "trt.Builder"]:
+    """Returns the TensorRT logger and builder, created once and reused across calls.
+
+    Creating a builder initializes CUDA and the plugin registry, so it is only done once per process.
+    Callers must hold ``_TRT_BUILDER_LOCK``.
+    """
+    trt_logger = trt.Logger(trt.Logger.WARNING)
+    trt.init_libnvinfer_plugins(trt_logger, "")
+    builder = trt.Builder(trt_logger)
+    logger.debug("Created TensorRT builder")
+    return trt_logger, builder
+
+
+def _get_layers_info(network: "trt.INetworkDefinition") -> tuple[list[str], dict]:
+    """Gets the custom layers and the tensors information of a TensorRT network.
+
+    Args:
+        network: TensorRT network definition.
+
+    Returns:
+        List of custom layers.
+        Dictionary containing tensors information: {'tensor_name': {'shape': tensor.shape, 'dtype': tensor.dtype}}
+    """
+    custom_layers = []
+    tensors = {}
+    for layer_idx in range(network.num_layers):
+        layer = network.get_layer(layer_idx)
+
+        # Obtain plugin layer names
+        if layer.type in _PLUGIN_LAYER_TYPES:
+            custom_layers.append(layer.name)
+            logger.debug(f"Found custom layer: {layer.name}")
+
+        # Collect each unique tensor once. A tensor is usually consumed by several layers, so its shape is
+        # only converted below instead of once per consumer.
+        for i in range(layer.num_inputs):
+            input_tensor = layer.get_input(i)
+            if input_tensor and input_tensor.name not in tensors:
+                tensors[input_tensor.name] = input_tensor
+
+        for i in range(layer.num_outputs):
+            output_tensor = layer.get_output(i)
+            if output_tensor and output_tensor.name not in tensors:
+                tensors[output_tensor.name] = output_tensor
+
+    # Collect all tensors' type and shape.
+    # Replace dynamic axis representation from -1 to 'unk' for 'onnxsim' support if enabled.
+    all_tensor_info = {
+        name: {"shape": ["unk" if (s == -1) else s for s in tensor.shape], "dtype": tensor.dtype}
+        for name, tensor in tensors.items()
+    }
+    return custom_layers, all_tensor_info
+
 
 def get_custom_layers(
     onnx_path: str | onnx.ModelProto,
     trt_plugins: list[str] | None,
     strongly_typed: bool = False,
+    use_cache: bool = True,
+    external_data_locations: set[str] | None = None,
 ) -> tuple[list[str], dict]:
     """Gets custom layers in ONNX model.
 
+    If the model is given as a path, the results are cached on disk under
+    ``$XDG_CACHE_HOME/modelopt/trt_parse``, keyed by a hash of the ONNX file, its external data and the
+    TensorRT plugins, so that subsequent calls on the same model skip TensorRT parsing. The cache can be
+    disabled by setting the ``MODELOPT_DISABLE_TRT_PARSE_CACHE=1`` environment variable.
+
     Args:
         onnx_path: Path or ModelProto of the input ONNX model.
         trt_plugins: list with paths to custom TensorRT plugins.
         strongly_typed: Boolean indicating whether to run TensorRT inference in stronglyTyped mode or not.
+        use_cache: Boolean indicating whether to use the on-disk cache of TensorRT parsing results.
+        external_data_locations: Relative paths of the external data files referenced by the ONNX file. If not
+            given, they are read from the ONNX file.
 
     Returns:
         List of custom layers.
@@ -50,22 +264,39 @@ def get_custom_layers(
     """
     logger.debug("Checking for custom TensorRT ops")
 
-    # Initialize TensorRT plugins
+    cache_path = None
+    use_cache = use_cache and os.environ.get("MODELOPT_DISABLE_TRT_PARSE_CACHE", "0") != "1"
+    if use_cache and isinstance(onnx_path, str):
+        if external_data_locations is None:
+            external_data_locations = _get_external_data_locations(
+                onnx.load(onnx_path, load_external_data=False)
+            )
+        cache_key = _get_trt_parse_cache_key(
+            onnx_path, external_data_locations, trt_plugins, strongly_typed
+        )
+        cache_path = os.path.join(_get_trt_parse_cache_dir(), f"{cache_key}.json")
+        cached = _load_trt_parse_cache(cache_path)
+        if cached is not None:
+            logger.info(f"Loaded TensorRT parsing results from cache {cache_path}")
+            return cached
+
+    # Initialize TensorRT plugins, skipping the ones already loaded in this process
     if trt_plugins:
         logger.debug(f"Loading TensorRT plugins: {trt_plugins}")
         for plugin in trt_plugins:
-            ctypes.CDLL(plugin)
-
-    # Create builder and network
-    trt_logger = trt.Logger(trt.Logger.WARNING)
-    trt.init_libnvinfer_plugins(trt_logger, "")
-    builder = trt.Builder(trt_logger)
-    network = (
-        builder.create_network(1 << int(trt.NetworkDefinitionCreationFlag.STRONGLY_TYPED))
-        if strongly_typed
-        else builder.create_network()
-    )
-    logger.debug("Created TensorRT builder and network")
+            if plugin not in _LOADED_PLUGINS:
+                ctypes.CDLL(plugin)
+                _LOADED_PLUGINS.add(plugin)
+
+    # Create network with the shared builder
+    with _TRT_BUILDER_LOCK:
+        trt_logger, builder = _get_trt_builder()
+        network = (
+            builder.create_network(1 << int(trt.NetworkDefinitionCreationFlag.STRONGLY_TYPED))
+            if strongly_typed
+            else builder.create_network()
+        )
+    logger.debug("Created TensorRT network")
 
     # Parse ONNX file
     parser = trt.OnnxParser(network, trt_logger)
@@ -76,35 +307,11 @@ def get_custom_layers(
         raise Exception(f"Failed to parse ONNX file: {''.join(error_str)}")
 
     # Obtain layer info
-    custom_layers = []
-    all_tensor_info = {}
-    for layer_idx in range(network.num_layers):
-        layer = network.get_layer(layer_idx)
-
-        # Obtain plugin layer names
-        if "PLUGIN" in str(layer.type):
-            custom_layers.append(layer.name)
-            logger.debug(f"Found custom layer: {layer.name}")
-
-        # Collect all tensors' type and shape.
-        # Replace dynamic axis representation from -1 to 'unk' for 'onnxsim' support if enabled.
-        for i in range(layer.num_inputs):
-            input_tensor = layer.get_input(i)
-            if input_tensor:
-                all_tensor_info[input_tensor.name] = {
-                    "shape": ["unk" if (s == -1) else s for s in input_tensor.shape],
-                    "dtype": input_tensor.dtype,
-                }
-
-        for i in range(layer.num_outputs):
-            output_tensor = layer.get_output(i)
-            if output_tensor and not all_tensor_info.get(output_tensor.name, None):
-                all_tensor_info[output_tensor.name] = {
-                    "shape": ["unk" if (s == -1) else s for s in output_tensor.shape],
-                    "dtype": output_tensor.dtype,
-                }
+    custom_layers, all_tensor_info = _get_layers_info(network)
 
     logger.info(f"Found {len(custom_layers)} custom layers and {len(all_tensor_info)} tensors")
+    if cache_path:
+        _save_trt_parse_cache(cache_path, custom_layers, all_tensor_info)
     return custom_layers, all_tensor_info
 
 
@@ -120,30 +327,39 @@ def infer_types_shapes(graph: gs.Graph, all_tensor_info: dict) -> None:
     """
     logger.debug("Inferring types and shapes for graph tensors")
 
-    def _map_trt_to_python_type(trt_type: trt.DataType):
-        try:
-            return trt.nptype(trt_type)
-        except TypeError as e:
-            logger.warning(f"{e}. TRT datatype: {trt_type}. Setting to None")
-            return None
-
+    node_outputs = {out.name: out for node in graph.nodes for out in node.outputs}
     updated_tensors = 0
-    for node in graph.nodes:
-        for out in node.outputs:
-            if out.name in all_tensor_info:
-                out.shape = all_tensor_info[out.name]["shape"]
-                out.dtype = out.dtype or _map_trt_to_python_type(all_tensor_info[out.name]["dtype"])
-                updated_tensors += 1
+    unsupported_trt_dtypes = set()
+    is_modified = False
+    for tensor_name, tensor_info in all_tensor_info.items():
+        out = node_outputs.get(tensor_name)
+        if out is None:
+            continue
 
+        shape = tensor_info["shape"]
+        dtype = out.dtype or _TRT_TO_NP_DTYPES.get(tensor_info["dtype"])
+        if dtype is None:
+            unsupported_trt_dtypes.add(tensor_info["dtype"])
+        if out.shape != shape or out.dtype != dtype:
+            out.shape = shape
+            out.dtype = dtype
+            is_modified = True
+        updated_tensors += 1
+
+    if unsupported_trt_dtypes:
+        logger.warning(
+            f"Could not map TRT datatypes {unsupported_trt_dtypes} to numpy datatypes. Setting to None"
+        )
     logger.info(f"Updated {updated_tensors} tensors with type and shape information")
-    graph.cleanup().toposort()
+    if is_modified:
+        graph.cleanup().toposort()
 
 
 def set_trt_plugin_domain(model: onnx.ModelProto, custom_ops: list[str]) -> onnx.ModelProto:
     """Set TensorRT plugin domain info in the graph.
 
     Args:
-        model: ONNX model to set custom op domain.
+        model: ONNX model to set custom op domain. The model is modified in-place.
         custom_ops: list of custom ops.
 
     Returns:
@@ -153,15 +369,16 @@ def set_trt_plugin_domain(model: onnx.ModelProto, custom_ops: list[str]) -> onnx
     trt_plugin_domain = "trt.plugins"
     trt_plugin_version = 1
 
-    graph = gs.import_onnx(model)
-    for node in graph.nodes:
-        if node.op in custom_ops:
+    # Only the nodes' domain is updated, so modify the proto in-place instead of round-tripping through GS
+    custom_ops_set = set(custom_ops)
+    for node in model.graph.node:
+        if node.op_type in custom_ops_set:
             # Add TRT domain to each custom node
             node.domain = trt_plugin_domain
 
     # Add TRT domain and version to the graph
-    model = gs.export_onnx(graph)
-    model.opset_import.append(onnx.helper.make_opsetid(trt_plugin_domain, trt_plugin_version))
+    if not any(opset.domain == trt_plugin_domain for opset in model.opset_import):
+        model.opset_import.append(onnx.helper.make_opsetid(trt_plugin_domain, trt_plugin_version))
     logger.info(f"Added TRT plugin domain {trt_plugin_domain} version {trt_plugin_version}")
     return model
 
@@ -220,10 +437,18 @@ def load_onnx_model(
     custom_ops = []
     has_custom_op = False
 
-    # Load the model and weights
-    onnx_model = onnx.load(onnx_path, load_external_data=True)
+    # Load the model without weights stored as external data. These are only loaded once they are needed,
+    # so that they are not held in memory while TensorRT parses the model from disk.
+    onnx_model = onnx.load(onnx_path, load_external_data=False)
+    base_dir = os.path.dirname(os.path.abspath(onnx_path))
+    external_data_locations = _get_external_data_locations(onnx_model)
+    external_data_size = sum(
+        os.path.getsize(os.path.join(base_dir, location)) for location in external_data_locations
+    )
     size_threshold = 2 * (1024**3)  # 2GB
-    use_external_data_format = onnx_model.ByteSize() > size_threshold or use_external_data_format
+    use_external_data_format = (
+        onnx_model.ByteSize() + external_data_size > size_threshold or use_external_data_format
+    )
 
     # If inputs are dynamic and override shapes are given, set them as static
     dynamic_inputs = get_dynamic_graph_inputs(onnx_model)
@@ -234,40 +459,59 @@ def load_onnx_model(
 
         if override_shapes:
             override_shapes_arr = parse_shapes_spec(override_shapes)
+            dynamic_input_names = set(input_names)
             for graph_input in onnx_model.graph.input:
-                if graph_input.name not in input_names:
+                if graph_input.name not in dynamic_input_names:
                     continue
                 inp_shapes = override_shapes_arr[graph_input.name]
                 logger.info(f"Setting '{graph_input.name}' shape to {inp_shapes}")
-                for idx, (d, s) in enumerate(
-                    zip(graph_input.type.tensor_type.shape.dim, inp_shapes)
-                ):
+                for d, s in zip(graph_input.type.tensor_type.shape.dim, inp_shapes):
                     if not d.dim_value:
-                        graph_input.type.tensor_type.shape.dim[idx].dim_value = s
+                        d.dim_value = s
 
+            # The static-shaped model is needed on disk by the calibration session and TensorRT parsing.
             static_shaped_onnx_path = onnx_path.replace(".onnx", "_static.onnx")
-            save_onnx(onnx_model, static_shaped_onnx_path, use_external_data_format)
+            if external_data_size:
+                # Only the graph inputs changed, so the static-shaped model is saved next to the original one
+                # and keeps referencing its external data, instead of writing all the weights again.
+                save_onnx(onnx_model, static_shaped_onnx_path)
+            else:
+                save_onnx(onnx_model, static_shaped_onnx_path, use_external_data_format)
+                # The weights may have been moved to a new external data file next to the static-shaped model
+                external_data_locations = _get_external_data_locations(onnx_model)
             intermediate_generated_files.append(static_shaped_onnx_path)  # type: ignore[union-attr]
 
-    if TRT_PYTHON_AVAILABLE and platform.system() != "Windows":
+    # Models with only standard ONNX ops and no user-given plugins can't have custom TensorRT ops, so the
+    # costly TensorRT parsing can be skipped
+    has_non_standard_nodes = bool(trt_plugins) or _has_non_standard_nodes(onnx_model)
+    if not has_non_standard_nodes:
+        logger.debug("Model only has standard ONNX ops, skipping custom TensorRT ops check")
+
+    if TRT_PYTHON_AVAILABLE and platform.system() != "Windows" and has_non_standard_nodes:
         # Check if there's a custom TensorRT op in the ONNX model. If so, make it ORT compatible by adding
         # `trt.plugins to the ONNX graph.
         custom_layers, all_tensor_info = get_custom_layers(
-            static_shaped_onnx_path or onnx_path, trt_plugins
+            static_shaped_onnx_path or onnx_path,
+            trt_plugins,
+            external_data_locations=external_data_locations,
         )
         has_custom_op = bool(custom_layers)
 
-        if has_custom_op:
-            logger.debug(f"Found custom layers: {custom_layers}")
-            custom_ops = {
-                node.op_type for node in onnx_model.graph.node if node.name in custom_layers
-            }
+    if has_custom_op:
+        logger.debug(f"Found custom layers: {custom_layers}")
+        custom_layers_set = set(custom_layers)
+        custom_ops = {
+            node.op_type for node in onnx_model.graph.node if node.name in custom_layers_set
+        }
+
+        # Set TensorRT plugin domain info in the graph for ORT compatibility
+        onnx_model = set_trt_plugin_domain(onnx_model, custom_ops)
 
-            # Set TensorRT plugin domain info in the graph for ORT compatibility
-            onnx_model = set_trt_plugin_domain(onnx_model, custom_ops)
+        # Infer types and shapes in the graph for ORT compatibility
+        onnx_model = infer_types_shapes_tensorrt(onnx_model, trt_plugins or [], all_tensor_info)
 
-            # Infer types and shapes in the graph for ORT compatibility
-            onnx_model = infer_types_shapes_tensorrt(onnx_model, trt_plugins or [], all_tensor_info)
+    # Load the weights stored as external data, if not yet loaded
+    onnx.external_data_helper.load_external_data_for_model(onnx_model, base_dir)
 
     return (
         onnx_model,
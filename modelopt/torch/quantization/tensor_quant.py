@@ -767,6 +767,19 @@ class LegacyFakeTensorQuantFunction(Function):
         return grad_inputs, None, None, None, None, None
 
 
+@torch.jit.script
+def _quantize_signed(
+    inputs: torch.Tensor, scale: torch.Tensor, max_bound: float, narrow_range: bool
+) -> torch.Tensor:
+    min_bound = -max_bound if narrow_range else -max_bound - 1.0
+    return torch.clamp((inputs * scale).round_(), min_bound, max_bound)
+
+
+@torch.jit.script
+def _quantize_unsigned(inputs: torch.Tensor, scale: torch.Tensor, max_bound: float) -> torch.Tensor:
+    return torch.clamp((inputs * scale).round_(), 0.0, max_bound)
+
+
 def _tensor_quant(inputs, amax, num_bits=8, unsigned=False, narrow_range=True):
     """Shared function body between TensorQuantFunction and FakeTensorQuantFunction."""
     # Fine scale, per channel scale will be handled by broadcasting, which could be tricky. Pop a warning.
@@ -784,13 +797,8 @@ def _tensor_quant(inputs, amax, num_bits=8, unsigned=False, narrow_range=True):
     if min_amax < 0:
         raise ValueError("Negative values in amax")
 
-    max_bound = torch.tensor((2.0 ** (num_bits - 1 + int(unsigned))) - 1.0, device=amax.device)
-    if unsigned:
-        min_bound = 0
-    elif narrow_range:
-        min_bound = -max_bound
-    else:
-        min_bound = -max_bound - 1
+    max_bound_value = (2.0 ** (num_bits - 1 + int(unsigned))) - 1.0
+    max_bound = torch.tensor(max_bound_value, device=amax.device)
     scale = max_bound / amax
 
     epsilon = 1.0 / (1 << 24)
@@ -798,7 +806,10 @@ def _tensor_quant(inputs, amax, num_bits=8, unsigned=False, narrow_range=True):
         zero_amax_mask = amax <= epsilon
         scale[zero_amax_mask] = 0  # Value quantized with amax=0 should all be 0
 
-    outputs = torch.clamp((inputs * scale).round_(), min_bound, max_bound)
+    if unsigned:
+        outputs = _quantize_unsigned(inputs, scale, max_bound_value)
+    else:
+        outputs = _quantize_signed(inputs, scale, max_bound_value, narrow_range)
 
     if min_amax <= epsilon:
         scale[zero_amax_mask] = (
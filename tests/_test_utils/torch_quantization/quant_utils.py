@@ -13,16 +13,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import torch
-
 
 def quant(x, amax, num_bits=8, fake=False, narrow_range=True):
     """Quantize x using torch."""
     intmax = 2.0 ** (num_bits - 1) - 1.0
     intmin = -intmax if narrow_range else -intmax - 1
     scale = intmax / amax
-    # x_q = torch.round(torch.clamp(x * scale, intmin, intmax))
-    x_q = torch.clamp((x * scale).round_(), intmin, intmax)
+    # Round and clamp in-place so that only one full-size tensor is allocated
+    x_q = (x * scale).round_().clamp_(intmin, intmax)
 
     if fake:
         x_q /= scale
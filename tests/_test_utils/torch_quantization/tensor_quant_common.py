@@ -29,20 +29,29 @@ class TensorQuantCommon:
     is_fake = None
     return_tuple = None
 
+    @pytest.fixture(scope="class")
+    def random_inputs(self, request):
+        """Random inputs shared by the tests of a class, so they are allocated on the device only once.
+
+        Tests must not modify them in-place, use a clone instead.
+        """
+        torch.manual_seed(1234)
+        return {
+            shape: torch.randn(shape).to(request.cls.device)
+            for shape in [(3, 4, 5, 6), (3, 7), (31,)]
+        }
+
     def test_simple_run(self):
         """quantizer passes gradcheck"""
         x = Parameter(torch.randn(2, 3, dtype=torch.float64).to(self.device)) * 100
-        self.func(x, torch.max(torch.abs(x)), None, 7)
+        self.func(x, torch.linalg.vector_norm(x, ord=float("inf")), None, 7)
 
-    def test_per_tensor_scale(self):
+    def test_per_tensor_scale(self, random_inputs):
         """Tensor_quant matches quantization"""
-        x = torch.randn(31).to(self.device)
-        quant_x_ref = quant(
-            x,
-            torch.max(x.abs()),
-            fake=self.is_fake,
-        )
-        quant_x_test = self.func(x, torch.max(torch.abs(x)))
+        x = random_inputs[(31,)]
+        amax = torch.linalg.vector_norm(x, ord=float("inf"))
+        quant_x_ref = quant(x, amax, fake=self.is_fake)
+        quant_x_test = self.func(x, amax)
         if self.return_tuple:
             quant_x_test = quant_x_test[0]
         assert torch.allclose(quant_x_ref, quant_x_test)
@@ -54,7 +63,7 @@ class TensorQuantCommon:
 
         # Pytorch filter layout seems to be KCRS, reduce max to shape [K, 1, 1, 1] to test per channel scale
         # Shrink max a little, so that clip behavior is tested
-        amax_x = 0.7 * torch.amax(x.abs(), dim=(1, 2, 3), keepdims=True)
+        amax_x = 0.7 * torch.linalg.vector_norm(x, ord=float("inf"), dim=(1, 2, 3), keepdim=True)
         quant_x_ref = quant(
             x,
             amax_x,
@@ -66,11 +75,11 @@ class TensorQuantCommon:
 
         assert torch.allclose(quant_x_test, quant_x_ref)
 
-    def test_backward(self):
+    def test_backward(self, random_inputs):
         """Tensor_quant implements straight through estimator on the backward pass
         Note: this does not work for integer output_dtype
         """
-        x = torch.randn(3, 7, requires_grad=True).to(self.device)
+        x = random_inputs[(3, 7)].clone().requires_grad_(True)
         labels = torch.randint(6, (3,)).type(torch.LongTensor).to(self.device)
         quant_x = self.func(x, x.abs().max(), None, 7)
         if self.return_tuple:
@@ -83,25 +92,21 @@ class TensorQuantCommon:
         loss.backward()
         assert torch.allclose(float_quant_x.grad, x.grad)
 
-    def test_unsigned(self):
-        x = torch.randn(31).abs().to(self.device)
-        quant_x_ref = quant(
-            x,
-            torch.max(x.abs()),
-            num_bits=9,
-            fake=self.is_fake,
-        )
-        quant_x_test = self.func(x, torch.max(torch.abs(x)), None, 8, True)
+    def test_unsigned(self, random_inputs):
+        x = random_inputs[(31,)].abs()
+        amax = torch.linalg.vector_norm(x, ord=float("inf"))
+        quant_x_ref = quant(x, amax, num_bits=9, fake=self.is_fake)
+        quant_x_test = self.func(x, amax, None, 8, True)
         if self.return_tuple:
             quant_x_test = quant_x_test[0]
         assert torch.allclose(quant_x_test, quant_x_ref)
 
         x = torch.randn(3, 7)
         with pytest.raises(TypeError, match="Negative values encountered"):
-            self.func(x, torch.max(torch.abs(x)), None, 8, True)
+            self.func(x, torch.linalg.vector_norm(x, ord=float("inf")), None, 8, True)
 
-    def test_clip_gradient(self):
-        x = torch.randn(3, 7, requires_grad=True).to(self.device)
+    def test_clip_gradient(self, random_inputs):
+        x = random_inputs[(3, 7)].clone().requires_grad_(True)
         x.retain_grad()
         amax = x.abs().max() / 2
         x_in_range = (-amax <= x) * (x <= amax)
@@ -112,12 +117,12 @@ class TensorQuantCommon:
         loss.backward()
         assert torch.allclose(x.grad != 0, x_in_range)
 
-    def test_full_range(self):
+    def test_full_range(self, random_inputs):
         """fake_tensor_quant uses the full integer range when narrow=False"""
-        x = torch.randn(31).abs().to(self.device)
-        amax = torch.max(x.abs())
+        x = random_inputs[(31,)].abs()
+        amax = torch.linalg.vector_norm(x, ord=float("inf"))
         quant_x_ref = quant(x, amax, num_bits=9, fake=self.is_fake, narrow_range=False)
-        quant_x_test = self.func(x, torch.max(torch.abs(x)), None, 8, True, False)
+        quant_x_test = self.func(x, amax, None, 8, True, False)
         if self.return_tuple:
             quant_x_test = quant_x_test[0]
         assert torch.allclose(quant_x_test, quant_x_ref)
@@ -128,8 +133,8 @@ class TensorQuantTester(TensorQuantCommon):
     is_fake = False
     return_tuple = True
 
-    def test_overflow_fp16(self):
-        x = torch.randn(31).to(self.device).half()
+    def test_overflow_fp16(self, random_inputs):
+        x = random_inputs[(31,)].half()
         with pytest.raises(ValueError, match="scale is too large for FP16"):
             _ = self.func(x, torch.tensor(1e-4).to(self.device).half(), None, 8, False)
 
@@ -139,19 +144,18 @@ class FakeTensorQuantTester(TensorQuantCommon):
     is_fake = True
     return_tuple = False
 
-    def test_overflow_fp16(self):
-        x = torch.randn(31).to(self.device).half()
+    def test_overflow_fp16(self, random_inputs):
+        x = random_inputs[(31,)].half()
         quant_x_test = tensor_quant.fake_tensor_quant(
             x, torch.tensor(1e-4).to(self.device).half(), 8, False
         )
         assert not (torch.isinf(quant_x_test).any() or torch.isnan(quant_x_test).any())
 
-    @pytest.mark.parametrize("dtype", [torch.float32, torch.float16])
+    @pytest.mark.parametrize("dtype", [torch.float32, torch.float16, torch.bfloat16])
     @pytest.mark.parametrize("num_bits", [3, 4, 5, 7, 8, 11])
     @pytest.mark.parametrize("unsigned", [True, False])
-    def test_against_legacy(self, dtype, num_bits, unsigned):
-        torch.manual_seed(123456)
-        x = torch.randn(3, 4, 5, 6).to(dtype).to(self.device)
+    def test_against_legacy(self, random_inputs, dtype, num_bits, unsigned):
+        x = random_inputs[(3, 4, 5, 6)].to(dtype)
 
         amax_torch = torch.tensor(0.7).to(self.device)
 
@@ -161,11 +165,13 @@ class FakeTensorQuantTester(TensorQuantCommon):
         test_out = tensor_quant.fake_tensor_quant(x, amax_torch, None, num_bits, unsigned)
         if dtype == torch.float16:
             assert torch.allclose(legacy_out, test_out, rtol=1e-3, atol=1e-4)
+        elif dtype == torch.bfloat16:
+            assert torch.allclose(legacy_out, test_out, rtol=1e-2, atol=1e-2)
         else:
             assert torch.allclose(legacy_out, test_out)
 
-    def test_against_legacy_noncontiguous(self):
-        x = torch.randn(3, 4, 5, 6).to(self.device)
+    def test_against_legacy_noncontiguous(self, random_inputs):
+        x = random_inputs[(3, 4, 5, 6)]
 
         amax_torch = torch.tensor(0.7).to(self.device)
 
@@ -179,8 +185,8 @@ class FakeTensorQuantTester(TensorQuantCommon):
     @pytest.mark.parametrize("dtype", [torch.float32, torch.float16])
     @pytest.mark.parametrize("num_bits", [3, 4, 5, 7, 8, 11])
     @pytest.mark.parametrize("unsigned", [True, False])
-    def test_against_legacy_with_axis(self, dtype, num_bits, unsigned):
-        x = torch.randn(3, 4, 5, 6).to(self.device).to(dtype)
+    def test_against_legacy_with_axis(self, random_inputs, dtype, num_bits, unsigned):
+        x = random_inputs[(3, 4, 5, 6)].to(dtype)
 
         # amax along axis 1
         amax_torch = torch.tensor([0.8, 0.9, 0.7, 0.6]).to(self.device).view(1, -1, 1, 1)
@@ -18,12 +18,21 @@ import os
 import numpy as np
 import onnx
 import onnx_graphsurgeon as gs
+import pytest
 from _test_utils.import_helper import skip_if_no_libcudnn, skip_if_no_tensorrt
 
 skip_if_no_libcudnn()
 skip_if_no_tensorrt()
 
 
+@pytest.fixture(autouse=True)
+def trt_parse_cache_home(tmp_path, monkeypatch):
+    """Keeps the TensorRT parsing cache of the tests out of the user's cache directory."""
+    cache_home = tmp_path / "cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    return cache_home
+
+
 def _create_test_model_trt():
     opset_version = 13
     tensor_shapes = [1, 1, 128, 768]
@@ -145,3 +154,31 @@ def test_trt_plugin_autocast(tmp_path):
 
         # Check that the default conversion happened successfully: all tensors are FP16
         assert _assert_tensors_are_fp16(model_fp16)
+
+
+def test_trt_parse_cache(tmp_path, monkeypatch, trt_parse_cache_home):
+    from modelopt.onnx import trt_utils
+
+    model = _create_test_model_trt()
+    onnx_path = os.path.join(tmp_path, "model_with_trt_plugin_cache.onnx")
+    onnx.save_model(model, onnx_path)
+    cache_dir = trt_parse_cache_home / "modelopt" / "trt_parse"
+
+    # Disabling the cache should neither read nor write it
+    monkeypatch.setenv("MODELOPT_DISABLE_TRT_PARSE_CACHE", "1")
+    trt_utils.get_custom_layers(onnx_path, None)
+    assert not cache_dir.exists()
+    monkeypatch.delenv("MODELOPT_DISABLE_TRT_PARSE_CACHE")
+
+    # First call parses the model with TensorRT and populates the cache
+    custom_layers, all_tensor_info = trt_utils.get_custom_layers(onnx_path, None)
+    assert len(os.listdir(cache_dir)) == 1
+
+    # Second call should load the same results from the cache, without parsing the model with TensorRT
+    def _fail_get_trt_builder():
+        raise AssertionError("TensorRT parsing should be skipped on a cache hit")
+
+    monkeypatch.setattr(trt_utils, "_get_trt_builder", _fail_get_trt_builder)
+    cached_custom_layers, cached_all_tensor_info = trt_utils.get_custom_layers(onnx_path, None)
+    assert cached_custom_layers == custom_layers
+    assert cached_all_tensor_info == all_tensor_info
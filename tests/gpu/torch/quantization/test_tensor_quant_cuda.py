@@ -42,8 +42,9 @@ class TestFakeTensorQuantCuda(FakeTensorQuantTester):
         device = torch.cuda.device_count() - 1
         assert torch.cuda.current_device() != device
         x = torch.randn(3, 4).cuda(device)
-        quant_x = tensor_quant.fake_tensor_quant(x, torch.max(torch.abs(x)), None)
-        quant_x_ref = quant(x, torch.max(torch.abs(x)), fake=True)
+        amax = torch.linalg.vector_norm(x, ord=float("inf"))
+        quant_x = tensor_quant.fake_tensor_quant(x, amax, None)
+        quant_x_ref = quant(x, amax, fake=True)
         assert torch.allclose(quant_x, quant_x_ref)
 
 
@@ -59,9 +60,10 @@ class TestCudaExt:
 
         if unsigned:
             x = x.abs()
+        amax = torch.linalg.vector_norm(x, ord=float("inf"))
         assert torch.allclose(
-            get_cuda_ext().fake_tensor_quant(x, torch.max(torch.abs(x)), num_bits, unsigned),
-            tensor_quant.fake_tensor_quant(x, torch.max(torch.abs(x)), None, num_bits, unsigned),
+            get_cuda_ext().fake_tensor_quant(x, amax, num_bits, unsigned),
+            tensor_quant.fake_tensor_quant(x, amax, None, num_bits, unsigned),
             rtol=0,
             atol=0,
         )
@@ -70,12 +72,9 @@ class TestCudaExt:
     def test_cuda_ext_dtype(self, dtype):
         # Test fp16 and bf16
         x = torch.randn(31).cuda().to(dtype)
-        cuda_ext_out = (
-            get_cuda_ext().fake_tensor_quant(x, torch.max(torch.abs(x))).to(torch.float32)
-        )
-        pytorch_out = tensor_quant.fake_tensor_quant(x, torch.max(torch.abs(x)), None).to(
-            torch.float32
-        )
+        amax = torch.linalg.vector_norm(x, ord=float("inf"))
+        cuda_ext_out = get_cuda_ext().fake_tensor_quant(x, amax).to(torch.float32)
+        pytorch_out = tensor_quant.fake_tensor_quant(x, amax, None).to(torch.float32)
         assert torch.allclose(cuda_ext_out, pytorch_out, rtol=0, atol=0)
 
     @pytest.mark.parametrize("dtype", [torch.float32, torch.float16, torch.bfloat16])
@@ -103,8 +102,9 @@ class TestCudaExt:
     def test_cuda_ext_inplace(self, dtype):
         torch.manual_seed(1234)
         x = torch.randn(31).cuda().to(dtype)
-        quant_x_ref = quant(x, torch.max(x.abs()), fake=True)
-        get_cuda_ext().fake_tensor_quant_(x, torch.max(torch.abs(x)))
+        amax = torch.linalg.vector_norm(x, ord=float("inf"))
+        quant_x_ref = quant(x, amax, fake=True)
+        get_cuda_ext().fake_tensor_quant_(x, amax)
         if dtype == torch.bfloat16:
             assert torch.allclose(x, quant_x_ref, atol=1e-1)
         elif dtype == torch.float16:
@@ -0,0 +1,138 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import numpy as np
+import onnx
+import pytest
+from onnx import TensorProto, helper, numpy_helper
+
+from modelopt.onnx import trt_utils
+from modelopt.onnx.trt_utils import load_onnx_model
+
+
+def _create_dynamic_matmul_model() -> onnx.ModelProto:
+    weight = np.arange(64 * 32, dtype=np.float32).reshape(64, 32)
+    graph = helper.make_graph(
+        [helper.make_node("MatMul", ["input", "weight"], ["output"], name="MatMul_0")],
+        "dynamic_matmul",
+        [helper.make_tensor_value_info("input", TensorProto.FLOAT, ["batch", 64])],
+        [helper.make_tensor_value_info("output", TensorProto.FLOAT, ["batch", 32])],
+        [numpy_helper.from_array(weight, name="weight")],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 11
+    return model
+
+
+def test_load_onnx_model_static_shapes_external_data(tmp_path):
+    model = _create_dynamic_matmul_model()
+    weight = numpy_helper.to_array(model.graph.initializer[0])
+    onnx_path = os.path.join(tmp_path, "model.onnx")
+    onnx.save_model(
+        model,
+        onnx_path,
+        save_as_external_data=True,
+        location="model.onnx_data",
+        size_threshold=0,
+    )
+    files_before = set(os.listdir(tmp_path))
+
+    intermediate_generated_files = []
+    onnx_model, has_custom_op, _, static_shaped_onnx_path, _ = load_onnx_model(
+        onnx_path,
+        override_shapes="input:4x64",
+        intermediate_generated_files=intermediate_generated_files,
+    )
+
+    # Only the static-shaped model is written, it keeps referencing the original weights
+    assert not has_custom_op
+    assert intermediate_generated_files == [static_shaped_onnx_path]
+    assert set(os.listdir(tmp_path)) - files_before == {os.path.basename(static_shaped_onnx_path)}
+
+    static_model = onnx.load(static_shaped_onnx_path)
+    assert static_model.ir_version == 10
+    assert static_model.graph.input[0].type.tensor_type.shape.dim[0].dim_value == 4
+    assert np.array_equal(numpy_helper.to_array(static_model.graph.initializer[0]), weight)
+
+    # The returned model has its weights loaded
+    assert np.array_equal(numpy_helper.to_array(onnx_model.graph.initializer[0]), weight)
+
+
+@pytest.mark.parametrize("use_external_data_format", [False, True])
+def test_load_onnx_model_static_shapes_inline_weights(tmp_path, use_external_data_format):
+    model = _create_dynamic_matmul_model()
+    weight = numpy_helper.to_array(model.graph.initializer[0])
+    onnx_path = os.path.join(tmp_path, "model.onnx")
+    onnx.save_model(model, onnx_path)
+
+    onnx_model, _, _, static_shaped_onnx_path, _ = load_onnx_model(
+        onnx_path,
+        override_shapes="input:4x64",
+        use_external_data_format=use_external_data_format,
+        intermediate_generated_files=[],
+    )
+
+    # The static-shaped model is written with its weights, inline or as new external data
+    static_model = onnx.load(static_shaped_onnx_path)
+    assert static_model.ir_version == 10
+    assert static_model.graph.input[0].type.tensor_type.shape.dim[0].dim_value == 4
+    assert np.array_equal(numpy_helper.to_array(static_model.graph.initializer[0]), weight)
+
+    # The returned model has its weights loaded
+    assert np.array_equal(numpy_helper.to_array(onnx_model.graph.initializer[0]), weight)
+
+
+def _create_single_node_model(op_type: str, domain: str = "") -> onnx.ModelProto:
+    graph = helper.make_graph(
+        [helper.make_node(op_type, ["input"], ["output"], name=f"{op_type}_0", domain=domain)],
+        "single_node",
+        [helper.make_tensor_value_info("input", TensorProto.FLOAT, [4, 64])],
+        [helper.make_tensor_value_info("output", TensorProto.FLOAT, [4, 64])],
+    )
+    opset_imports = [helper.make_opsetid("", 13)]
+    if domain:
+        opset_imports.append(helper.make_opsetid(domain, 1))
+    return helper.make_model(graph, opset_imports=opset_imports)
+
+
+@pytest.mark.parametrize(
+    ("op_type", "domain", "trt_plugins", "expect_trt_parse"),
+    [
+        ("CustomOp", "custom.domain", None, True),
+        ("CustomSkipLayerNormPluginDynamic", "", None, True),
+        ("Relu", "", ["libcustom_plugin.so"], True),
+        ("Relu", "", None, False),
+    ],
+)
+def test_load_onnx_model_skips_trt_parse_for_standard_ops(
+    tmp_path, monkeypatch, op_type, domain, trt_plugins, expect_trt_parse
+):
+    parsed_models = []
+
+    def _get_custom_layers(onnx_path, trt_plugins, **kwargs):
+        parsed_models.append(onnx_path)
+        return [], {}
+
+    monkeypatch.setattr(trt_utils, "TRT_PYTHON_AVAILABLE", True)
+    monkeypatch.setattr(trt_utils, "get_custom_layers", _get_custom_layers)
+
+    onnx_path = os.path.join(tmp_path, "model.onnx")
+    onnx.save_model(_create_single_node_model(op_type, domain), onnx_path)
+    _, has_custom_op, _, _, _ = load_onnx_model(onnx_path, trt_plugins=trt_plugins)
+
+    assert not has_custom_op
+    assert parsed_models == ([onnx_path] if expect_trt_parse else [])